@@ -7,11 +7,12 @@ import time
 import logging
 import pytz
 import datetime
+import os
 import sys
-import glob
-import json
+import ijson
 import tqdm
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 ONE_HOUR = 60 * 60
 TIMEZONE = pytz.timezone("US/Pacific")
@@ -21,14 +22,14 @@ all_loggers = [logging.getLogger("singular_client"),
 logger = logging.getLogger("accuracy_check")
 
 
-compare_metrics = [Metrics.ADN_COST, Metrics.ADN_IMPRESSIONS, Metrics.CUSTOM_CLICKS, Metrics.CUSTOM_INSTALLS]
-compare_discrepancy_metrics = [
+compare_metrics = (Metrics.ADN_COST, Metrics.ADN_IMPRESSIONS, Metrics.CUSTOM_CLICKS, Metrics.CUSTOM_INSTALLS)
+compare_discrepancy_metrics = (
     DiscrepancyMetrics.TRACKER_INSTALLS,
     DiscrepancyMetrics.TRACKER_CLICKS,
     DiscrepancyMetrics.ADN_INSTALLS,
-    DiscrepancyMetrics.ADN_CLICKS]
+    DiscrepancyMetrics.ADN_CLICKS)
 
-dimensions = [Dimensions.APP,
+dimensions = (Dimensions.APP,
               Dimensions.SITE_PUBLIC_ID,
               Dimensions.SOURCE,
               Dimensions.OS,
@@ -53,9 +54,9 @@ dimensions = [Dimensions.APP,
               Dimensions.TRACKER_NAME,
               Dimensions.RETENTION,
               Dimensions.KEYWORD,
-              ]
+              )
 
-metrics = [
+metrics = (
     Metrics.ADN_IMPRESSIONS,
     Metrics.CUSTOM_INSTALLS,
     Metrics.CUSTOM_CLICKS,
@@ -67,18 +68,19 @@ metrics = [
     Metrics.ECPI,
     Metrics.OCVR,
     Metrics.ECPM,
-    Metrics.ECPC]
+    Metrics.ECPC)
 
-discrepancy_metrics = [DiscrepancyMetrics.ADN_CLICKS,
+discrepancy_metrics = (DiscrepancyMetrics.ADN_CLICKS,
                        DiscrepancyMetrics.ADN_INSTALLS,
                        DiscrepancyMetrics.TRACKER_CLICKS,
-                       DiscrepancyMetrics.TRACKER_INSTALLS]
+                       DiscrepancyMetrics.TRACKER_INSTALLS)
 
 def encode_date(timestamp):
     if isinstance(timestamp, str):
         return timestamp
-    else:
-        return ETLManager._encode_timestamp_to_date(timestamp)
+    if isinstance(timestamp, datetime.datetime):
+        timestamp = timestamp.date()
+    return timestamp.isoformat()
 
 
 def daterange(start_date, end_date):
@@ -113,18 +115,36 @@ all_metrics_to_check = compare_discrepancy_metrics + compare_metrics
 configure_logging(all_loggers)
 
 
-def get_dumped_total_per_source_date(start_date, end_date):
-    source_date2metrics = defaultdict(lambda: {i: 0.0 for i in all_metrics_to_check})
-    dates = list(daterange(start_date, end_date))
-    for cur_date in tqdm.tqdm(dates, desc="iterating over dates"):
-        files = glob.glob("data_dumps/*.%s.json" % encode_date(cur_date))
-        for file_path in files:
-            data = json.loads(open(file_path, 'rb').read().decode("utf8"))
-            for row in data["results"]:
-                for metric in all_metrics_to_check:
-                    cur_dict = source_date2metrics[(row[Dimensions.START_DATE], row[Dimensions.SOURCE])]
-                    cur_dict[metric] += row[metric] if row[metric] else 0
-    return dict(source_date2metrics)
+def sum_dump_file(file_path):
+    """
+    sum the checked metrics of a single dump file per (date, source)
+    """
+    source_date2totals = defaultdict(lambda: [0.0] * len(all_metrics_to_check))
+    with open(file_path, 'rb') as f:
+        for row in ijson.items(f, "results.item", use_float=True):
+            totals = source_date2totals[(row[Dimensions.START_DATE], row[Dimensions.SOURCE])]
+            for i, metric in enumerate(all_metrics_to_check):
+                totals[i] += row[metric] or 0
+    return source_date2totals
+
+
+def get_dumped_total_per_source_date(start_date, end_date, max_workers=8):
+    source_date2totals = defaultdict(lambda: [0.0] * len(all_metrics_to_check))
+    valid_dates = frozenset(encode_date(d) for d in daterange(start_date, end_date))
+    files = []
+    for entry in os.scandir("data_dumps"):
+        parts = entry.name.split(".")
+        if len(parts) >= 3 and parts[-1] == "json" and parts[-2] in valid_dates:
+            files.append(entry.path)
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        partials = pool.map(sum_dump_file, files)
+        for partial in tqdm.tqdm(partials, total=len(files), desc="iterating over dumps"):
+            for key, partial_totals in partial.items():
+                totals = source_date2totals[key]
+                for i, value in enumerate(partial_totals):
+                    totals[i] += value
+    return {key: dict(zip(all_metrics_to_check, totals)) for key, totals in source_date2totals.items()}
 
 
 def accuracy_check(api_key, start_date, end_date, max_error_rate):
@@ -144,19 +164,23 @@ def accuracy_check(api_key, start_date, end_date, max_error_rate):
                                 time_breakdown=TimeBreakdown.DAY
                                 )
     logger.info("comparing remote vs local")
+    start_date_key = Dimensions.START_DATE
+    source_key = Dimensions.SOURCE
+    empty_totals = {metric: 0.0 for metric in all_metrics_to_check}
     issues = []
     for row in results["value"]["results"]:
-        cur_date = row[Dimensions.START_DATE]
-        cur_source = row[Dimensions.SOURCE]
-        cur_local_totals = local_totals[(cur_date, cur_source)]
-        server_totals = {metric: row[metric] for metric in all_metrics_to_check}
+        cur_key = (row[start_date_key], row[source_key])
+        cur_local_totals = local_totals.get(cur_key, empty_totals)
         for metric in all_metrics_to_check:
-            server_value = server_totals[metric] if server_totals[metric] else 0
-            delta = abs(cur_local_totals[metric] - server_value)
-            if delta > 10 and delta / float(server_value) > max_error_rate:
-                issue = (cur_date, cur_source, metric, cur_local_totals[metric], server_value)
-                issues.append(issue)
-                logger.error("found issue on %s, %s, %s (local %d != server %d)" % issue)
+            server_value = row[metric] or 0
+            local_value = cur_local_totals[metric]
+            delta = abs(local_value - server_value)
+            # a zero server value with a large delta is always an issue
+            if delta > 10 and (not server_value or delta > max_error_rate * server_value):
+                issues.append(cur_key + (metric, local_value, server_value))
+
+    for issue in issues:
+        logger.error("found issue on %s, %s, %s (local %d != server %d)" % issue)
     if len(issues):
         logger.error("found %d issues" % len(issues))
     else:
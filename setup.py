@@ -26,7 +26,12 @@ For more information please visit our github repo: https://github.com/singular-l
         'pytz',
         'retrying',
     ],
-    extras_require={':python_version == "2.7"': ['futures']},
+    extras_require={
+        ':python_version == "2.7"': ['futures'],
+        'speedups': ['orjson; python_version >= "3.6"'],
+        'brotli': ['brotli; platform_python_implementation == "CPython"',
+                   'brotlicffi; platform_python_implementation != "CPython"'],
+    },
     classifiers=[
         'Programming Language :: Python',
         'Programming Language :: Python :: 2.7',
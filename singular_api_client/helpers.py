@@ -1,4 +1,35 @@
+import itertools
 import json
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup, see the `speedups` extra
+    orjson = None
+
+
+def json_dumps(value):
+    """
+    serialize `value` to a JSON string, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def json_loads(value):
+    """
+    deserialize a JSON document (str or bytes), using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+_display_name_and_id = itemgetter("display_name", "id")
+_display_name_and_name = itemgetter("display_name", "name")
+_data_source_availability_fields = itemgetter("username", "status", "is_empty_data", "is_active_last_30_days",
+                                              "last_updated_utc", "source", "is_available")
 
 
 class ReportStatusResponse(object):
@@ -7,30 +38,33 @@ class ReportStatusResponse(object):
     DONE = "DONE"
     FAILED = "FAILED"
 
+    __slots__ = ("report_id", "status", "url_expires_in", "download_url", "error_message", "_serialized")
+
     def __init__(self, response_value):
         self.report_id = response_value["report_id"]
         self.status = response_value["status"]
         self.url_expires_in = response_value.get("url_expires_in")
         self.download_url = response_value.get("download_url")
         self.error_message = response_value.get("error_message")
-        self._original = response_value
+        # stdlib formatting on purpose, so str() doesn't depend on whether orjson is installed
+        self._serialized = json.dumps(response_value)
 
     def __repr__(self):
-        base = "<ReportStatus %(status)s: report_id=%(report_id)s" % dict(status=self.status, report_id=self.report_id)
-        parts = [base]
         if self.status == self.DONE:
-            parts.append("download_url=%(download_url)s, url_expires_in=%(expries)s" % \
-                         dict(download_url=self.download_url, expries=self.url_expires_in))
+            return "<ReportStatus %s: report_id=%s, download_url=%s, url_expires_in=%s>" % (
+                self.status, self.report_id, self.download_url, self.url_expires_in)
         elif self.status == self.FAILED:
-            parts.append("error_message=%(error_message)s" % dict(error_message=self.error_message))
-        final = ", ".join(parts) + ">"
-        return final
+            return "<ReportStatus %s: report_id=%s, error_message=%s>" % (
+                self.status, self.report_id, self.error_message)
+        return "<ReportStatus %s: report_id=%s>" % (self.status, self.report_id)
 
     def __str__(self):
-        return json.dumps(self._original)
+        return self._serialized
 
 
 class CustomDimension(object):
+    __slots__ = ("display_name", "id")
+
     def __init__(self, display_name, id):
         self.display_name = display_name
         self.id = id
@@ -41,20 +75,18 @@ class CustomDimension(object):
         helper method to parse custom dimensions list from the `custom_dimensions` endpoint
         :rtype: list[CustomDimension]
         """
-        ret = []
-        for value in list_from_endpoint:
-            ret.append(CustomDimension(value["display_name"], value["id"]))
-        return ret
+        return [CustomDimension(*_display_name_and_id(value)) for value in list_from_endpoint]
 
     def __repr__(self):
-        return "<CustomDimension: %(display_name)s (id=%(id)s)>" % dict(display_name=self.display_name,
-                                                                        id=self.id)
+        return "<CustomDimension: %s (id=%s)>" % (self.display_name, self.id)
 
     def __str__(self):
         return self.id
 
 
 class CohortMetric(object):
+    __slots__ = ("display_name", "name")
+
     def __init__(self, display_name, name):
         self.display_name = display_name
         self.name = name
@@ -65,37 +97,35 @@ class CohortMetric(object):
         helper method to parse custom dimensions list from the `cohort_metrics` endpoint
         :rtype: list[CohortMetric]
         """
-        ret = []
-        for value in list_from_endpoint:
-            ret.append(CohortMetric(value["display_name"], value["name"]))
-        return ret
+        return [CohortMetric(*_display_name_and_name(value)) for value in list_from_endpoint]
 
     def __repr__(self):
-        return "<CohortMetric: %(display_name)s (name=%(name)s)>" % dict(display_name=self.display_name,
-                                                                         name=self.name)
+        return "<CohortMetric: %s (name=%s)>" % (self.display_name, self.name)
 
     def __str__(self):
         return self.name
 
 
 class CohortMetricsResponse(object):
+    _EMPTY_REPR = "<Cohort Metrics: No Custom Metrics Found>"
+
     def __init__(self, value_from_endpoint):
         self.periods = value_from_endpoint["periods"]
         self.metrics = CohortMetric.parse_list(value_from_endpoint["metrics"])
 
     def __repr__(self):
-        if len(self.metrics) > 0:
-            lines = ["<periods = %s>" % self.periods,
-                     "<metrics = ["]
-            for metric in self.metrics:
-                lines.append("\t%s" % repr(metric))
-            lines.append("]>")
-            return "\n".join(lines)
-        else:
-            return "<Cohort Metrics: No Custom Metrics Found>"
+        if not self.metrics:
+            return self._EMPTY_REPR
+
+        lines = itertools.chain(["<periods = %s>" % self.periods, "<metrics = ["],
+                                ("\t" + repr(metric) for metric in self.metrics),
+                                ["]>"])
+        return "\n".join(lines)
 
 
 class SkanEvent(object):
+    __slots__ = ("display_name", "name")
+
     def __init__(self, display_name, name):
         self.display_name = display_name
         self.name = name
@@ -106,31 +136,34 @@ class SkanEvent(object):
         helper method to parse skan events list from the `skan_events` endpoint
         :rtype: list[SkanEvent]
         """
-        return [SkanEvent(value["display_name"], value["name"]) for value in results]
+        return [SkanEvent(*_display_name_and_name(value)) for value in results]
 
     def __repr__(self):
-        return "<SkanEvent: %(display_name)s (name=%(name)s)>" % dict(display_name=self.display_name,
-                                                                      name=self.name)
+        return "<SkanEvent: %s (name=%s)>" % (self.display_name, self.name)
 
     def __str__(self):
         return self.name
 
 
 class SkanEventsResponse(object):
+    _EMPTY_REPR = "<skan_events: No Events Found>"
+
     def __init__(self, value_from_endpoint):
         self.events = SkanEvent.parse_list(value_from_endpoint["skan_events"])
 
     def __repr__(self):
-        if len(self.events) == 0:
-            return "<skan_events: No Events Found>"
+        if not self.events:
+            return self._EMPTY_REPR
 
-        lines = [repr(event) for event in self.events]
-        return "<skan_events = [\n%s]\n>" % ("\n".join(lines))
+        return "<skan_events = [\n%s]\n>" % "\n".join(repr(event) for event in self.events)
 
 
 class DataSourceAvailabilityResponse(object):
+    __slots__ = ("username", "status", "is_empty_data", "is_active_last_30_days", "last_updated_utc", "source",
+                 "is_available")
+
     def __init__(self, username, status, is_empty_data, is_active_last_30_days, last_updated_utc,
-                 source, is_available, **extra):
+                 source, is_available, **_):
         self.username = username
         self.status = status
         self.is_empty_data = is_empty_data
@@ -138,22 +171,18 @@ class DataSourceAvailabilityResponse(object):
         self.last_updated_utc = last_updated_utc
         self.source = source
         self.is_available = is_available
-        self.__extra = extra
 
     @staticmethod
     def parse_list(response_list):
         """
         :rtype: list[DataSourceAvailabilityResponse]
         """
-        ret = []
-        for value in response_list:
-            ret.append(DataSourceAvailabilityResponse(**value))
-        return ret
+        return [DataSourceAvailabilityResponse(*_data_source_availability_fields(value)) for value in response_list]
 
     def __repr__(self):
-        return "<DataSourceAvailability: %(source)s (%(username)s) - %(status)s, is_available=%(is_available)s, " \
-               "last_updated_utc=%(last_updated_utc)s, is_empty_data=%(is_empty_data)s, " \
-               "is_active_last_30_days=%(is_active_last_30_days)s>" % self.__dict__
+        return "<DataSourceAvailability: %s (%s) - %s, is_available=%s, last_updated_utc=%s, is_empty_data=%s, " \
+               "is_active_last_30_days=%s>" % (self.source, self.username, self.status, self.is_available,
+                                               self.last_updated_utc, self.is_empty_data, self.is_active_last_30_days)
 
 
 class DataAvailabilityResponse(object):
@@ -162,8 +191,7 @@ class DataAvailabilityResponse(object):
         self.data_sources = DataSourceAvailabilityResponse.parse_list(endpoint_response["data_sources"])
 
     def __repr__(self):
-        lines = ["<DataAvailability: is_all_data_available=%s, data_sources=see individual statuses below>"
-                 % self.is_all_data_available]
-        for data_source_status in self.data_sources:
-            lines.append("\t" + repr(data_source_status))
-        return "\n".join(lines)
+        header = "<DataAvailability: is_all_data_available=%s, data_sources=see individual statuses below>" \
+                 % self.is_all_data_available
+        return "\n".join(itertools.chain([header], ("\t" + repr(data_source_status)
+                                                    for data_source_status in self.data_sources)))
@@ -116,7 +116,8 @@ class TimeBreakdown(object):
     __ALL_OPTIONS__ = None
 
 
-TimeBreakdown.__ALL_OPTIONS__ = [TimeBreakdown.ALL, TimeBreakdown.DAY, TimeBreakdown.WEEK, TimeBreakdown.MONTH]
+TimeBreakdown.__ALL_OPTIONS__ = frozenset([TimeBreakdown.ALL, TimeBreakdown.DAY, TimeBreakdown.WEEK,
+                                            TimeBreakdown.MONTH])
 
 
 class CountryCodeFormat(object):
@@ -126,7 +127,7 @@ class CountryCodeFormat(object):
     __ALL_OPTIONS__ = None
 
 
-CountryCodeFormat.__ALL_OPTIONS__ = [CountryCodeFormat.ISO, CountryCodeFormat.ISO3]
+CountryCodeFormat.__ALL_OPTIONS__ = frozenset([CountryCodeFormat.ISO, CountryCodeFormat.ISO3])
 
 
 class Format(object):
@@ -136,4 +137,4 @@ class Format(object):
     __ALL_OPTIONS__ = None
 
 
-Format.__ALL_OPTIONS__ = [Format.JSON, Format.CSV]
+Format.__ALL_OPTIONS__ = frozenset([Format.JSON, Format.CSV])
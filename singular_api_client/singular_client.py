@@ -1,17 +1,28 @@
 import requests
 from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util import make_headers
 from requests.packages.urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import json
+import random
+import time
 
 from singular_api_client.helpers import CohortMetric, SkanEventsResponse, SkanEvent
 from .params import Format, Dimensions, DiscrepancyMetrics, TimeBreakdown, CountryCodeFormat, Metrics
 from .exceptions import ArgumentValidationException, APIException, UnexpectedAPIException
 from .helpers import ReportStatusResponse, CustomDimension, CohortMetricsResponse, \
-    DataAvailabilityResponse
+    DataAvailabilityResponse, json_dumps, json_loads
 from .version import __version__
 
 logger = logging.getLogger("singular_client")
+_monotonic = getattr(time, "monotonic", time.time)
+# urllib3 1.26 renamed `method_whitelist` to `allowed_methods`, and 2.0 dropped the old name
+_RETRY_METHODS_KWARG = "allowed_methods" if hasattr(Retry, "DEFAULT_ALLOWED_METHODS") else "method_whitelist"
+
+try:
+    _string_types = (basestring,)
+except NameError:
+    _string_types = (str,)
 
 
 class SingularClient(object):
@@ -23,41 +34,93 @@ class SingularClient(object):
     """
     BASE_API_URL = "https://api.singular.net/api/"
     DEFAULT_HTTP_TIMEOUT = 60 * 5
-
-    def __init__(self, api_key, http_timeout=DEFAULT_HTTP_TIMEOUT, user_agent='Singular API Client v%s' % __version__):
-        self.api_key = api_key
-        self.user_agent = user_agent
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_POOL_MAXSIZE = 32
+    DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    DEFAULT_METADATA_TTL = 60 * 5
+    DEFAULT_WAIT_TIMEOUT = 60 * 60
+
+    def __init__(self, api_key, http_timeout=DEFAULT_HTTP_TIMEOUT, user_agent='Singular API Client v%s' % __version__,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, metadata_ttl=DEFAULT_METADATA_TTL, eager_connect=False):
+        self.metadata_ttl = metadata_ttl
+        self._metadata_cache = {}
         session = requests.Session()
+        session.headers.update({"Authorization": api_key,
+                                "User-Agent": user_agent,
+                                # every encoding urllib3 can decode here (adds br when brotli is installed)
+                                "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"]})
         retry = Retry(
             connect=5,
+            status=5,
             backoff_factor=0.5,
-            status_forcelist=(500, 502, 503, 504),
-            method_whitelist=('GET', 'POST')
+            status_forcelist=(429, 500, 502, 503, 504),
+            # hand the last 429/5xx response back to `_verify_response` instead of raising `RetryError`
+            raise_on_status=False,
+            # creating a report is not idempotent, so only GET requests are retried once a response was received
+            **{_RETRY_METHODS_KWARG: ('GET',)}
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        # keep enough connections per host for concurrent callers (e.g. `poll_reports`) to reuse
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         self.default_http_timeout = http_timeout
         self.session = session
+        if eager_connect:
+            self._warm_up()
+
+    @property
+    def api_key(self):
+        return self.session.headers["Authorization"]
+
+    @api_key.setter
+    def api_key(self, api_key):
+        # sent from the session's headers, so a new key applies to the next request
+        self.session.headers["Authorization"] = api_key
+
+    @property
+    def user_agent(self):
+        return self.session.headers["User-Agent"]
 
-    def create_async_report(self, start_date, end_date,
-                            format=Format.JSON,
-                            dimensions=(Dimensions.APP, Dimensions.OS, Dimensions.SOURCE),
-                            metrics=(Metrics.ADN_COST, Metrics.ADN_IMPRESSIONS),
-                            discrepancy_metrics=(DiscrepancyMetrics.ADN_CLICKS, DiscrepancyMetrics.ADN_INSTALLS),
-                            cohort_metrics=None,
-                            cohort_periods=None,
-                            source=None,
-                            app=None,
-                            display_alignment=True,
-                            time_breakdown=TimeBreakdown.ALL,
-                            country_code_format=CountryCodeFormat.ISO3,
-                            filters=None,
-                            **kwargs
-                            ):
+    @user_agent.setter
+    def user_agent(self, user_agent):
+        self.session.headers["User-Agent"] = user_agent
+
+    def _warm_up(self, timeout=5):
+        """
+        Open a pooled connection up front, so the first real call doesn't pay for the TLS handshake.
+          The request goes through an adapter sharing the session's connection pools but without its retries,
+          so an unreachable API costs at most a single `timeout` (connect + read).
+        """
+        adapter = HTTPAdapter(max_retries=0)
+        adapter.poolmanager = self.session.get_adapter(self.BASE_API_URL).poolmanager
+        request = self.session.prepare_request(requests.Request("HEAD", self.BASE_API_URL))
+        # same verify/cert/proxies as `session.request` would use, otherwise the connection lands in another pool
+        settings = self.session.merge_environment_settings(request.url, {}, None, None, None)
+        try:
+            # reading the (empty) body releases the connection back to the pool
+            adapter.send(request, timeout=timeout, **settings).content
+        except requests.RequestException as e:
+            logger.info("eager connect to %s failed: %r", self.BASE_API_URL, e)
+
+    def close(self):
+        """
+        Close the client's pooled connections.
+          The client can also be used as a context manager, closing it on exit.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def create_async_report(self, start_date, end_date, *args, **kwargs):
         """
         Use this endpoint to run custom queries in the Singular platform for aggregated statistics without keeping
-         a live connection throughout the request
+         a live connection throughout the request.
+          The arguments (and their defaults) are defined once by `_build_async_report_query`, which
+          `create_async_reports` uses as well.
 
         :param start_date: "YYYY-mm-dd" format date
         :param end_date: "YYYY-mm-dd" format date
@@ -76,20 +139,70 @@ class SingularClient(object):
          between campaign and creative statistics
         :param time_breakdown: Break results by the requested time period, for example TimeBreakdown.DAY
         :param country_code_format: Country code formatting option, for example CountryCodeFormat.ISO3
-        :param filters: a JSON encoded list of filters. Can be used to apply more complex filters than simply filtering
-          by app or source. The relation between different elements of the list is an AND relation.
+        :param filters: a list of filters, or the same list already JSON encoded. Can be used to apply more complex
+          filters than simply filtering by app or source. The relation between different elements of the list is an
+          AND relation.
           A full list of the dimensions you can filter by and potential values can be retrieved from the
           `get_reporting_filters` endpoint.
         :return: report_id
         """
 
-        query_dict = self._build_reporting_query(start_date, end_date, format, dimensions, metrics,
-                                                 discrepancy_metrics, cohort_metrics, cohort_periods, app,
-                                                 source, display_alignment, time_breakdown, country_code_format,
-                                                 filters, **kwargs)
+        query_dict = self._build_async_report_query(start_date, end_date, *args, **kwargs)
+        return self._post_async_report(query_dict)
+
+    def create_async_reports(self, queries, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Enqueue several async reports concurrently over the client's pooled connections.
+          All queries are validated before the first report is created, so an invalid query doesn't leave the
+          reports of the valid ones running unaccounted for.
+
+        :param queries: list of dicts, each holding the keyword arguments of a single `create_async_report` call,
+          for example [dict(start_date="2018-05-08", end_date="2018-05-08", source="adwords"), ...]
+        :param max_workers: maximum number of concurrent requests
+        :return: the report_id of each query, in the same order as `queries`
+        :rtype: list[str]
+        :raises SingularClientException: if creating any of the reports failed, once all other requests are done.
+          The exception's `report_ids` attribute holds the report_id of each query, or None where creation failed,
+          so reports that were created can still be tracked.
+        """
+        query_dicts = [self._build_async_report_query(**query) for query in queries]
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(self._post_async_report, query_dict) for query_dict in query_dicts]
+
+        errors = [future.exception() for future in futures]
+        report_ids = [future.result() if error is None else None for future, error in zip(futures, errors)]
+        for error in errors:
+            if error is not None:
+                error.report_ids = report_ids
+                raise error
+        return report_ids
 
+    @classmethod
+    def _build_async_report_query(cls, start_date, end_date,
+                                  format=Format.JSON,
+                                  dimensions=(Dimensions.APP, Dimensions.OS, Dimensions.SOURCE),
+                                  metrics=(Metrics.ADN_COST, Metrics.ADN_IMPRESSIONS),
+                                  discrepancy_metrics=(DiscrepancyMetrics.ADN_CLICKS, DiscrepancyMetrics.ADN_INSTALLS),
+                                  cohort_metrics=None,
+                                  cohort_periods=None,
+                                  source=None,
+                                  app=None,
+                                  display_alignment=True,
+                                  time_breakdown=TimeBreakdown.ALL,
+                                  country_code_format=CountryCodeFormat.ISO3,
+                                  filters=None,
+                                  **kwargs
+                                  ):
+        """
+        build the `create_async_report` query; see `create_async_report` for the arguments
+        """
+        return cls._build_reporting_query(start_date, end_date, format, dimensions, metrics, discrepancy_metrics,
+                                          cohort_metrics, cohort_periods, app, source, display_alignment,
+                                          time_breakdown, country_code_format, filters, **kwargs)
+
+    def _post_async_report(self, query_dict):
         response = self._api_post("v2.0/create_async_report", data=query_dict)
-        parsed_response = response.json()
+        parsed_response = self._parse_json(response)
         return parsed_response["value"]["report_id"]
 
     def create_async_skadnetwork_raw_report(self, start_date, end_date,
@@ -118,8 +231,9 @@ class SingularClient(object):
         :param app: optional list of app names to filter by
         :param time_breakdown: Break results by the requested time period, for example TimeBreakdown.DAY
         :param country_code_format: Country code formatting option, for example CountryCodeFormat.ISO3
-        :param filters: a JSON encoded list of filters. Can be used to apply more complex filters than simply filtering
-          by app or source. The relation between different elements of the list is an AND relation.
+        :param filters: a list of filters, or the same list already JSON encoded. Can be used to apply more complex
+          filters than simply filtering by app or source. The relation between different elements of the list is an
+          AND relation.
           A full list of the dimensions you can filter by and potential values can be retrieved from the
           `get_reporting_filters` endpoint.
         :param skadnetwork_date_type: the type of date you want the report to be based on:
@@ -133,7 +247,7 @@ class SingularClient(object):
                                                       filters, skadnetwork_date_type, **kwargs)
 
         response = self._api_post("v2.0/create_async_skadnetwork_raw_report", data=query_dict)
-        parsed_response = response.json()
+        parsed_response = self._parse_json(response)
         return parsed_response["value"]["report_id"]
 
     def create_async_unified_report(self, start_date, end_date,
@@ -164,8 +278,9 @@ class SingularClient(object):
         :param app: optional List of app names to filter by
         :param time_breakdown: Break results by the requested time period, for example TimeBreakdown.DAY
         :param country_code_format: Country code formatting option, for example CountryCodeFormat.ISO3
-        :param filters: A JSON encoded list of filters. Can be used to apply more complex filters than simply filtering
-          by app or source. The relation between different elements of the list is an AND relation.
+        :param filters: a list of filters, or the same list already JSON encoded. Can be used to apply more complex
+          filters than simply filtering by app or source. The relation between different elements of the list is an
+          AND relation.
           A full list of the dimensions you can filter by and potential values can be retrieved from the
           `get_reporting_filters` endpoint.
         :return: report_id
@@ -176,7 +291,7 @@ class SingularClient(object):
                                                  **kwargs)
 
         response = self._api_post("v2.0/create_async_unified_report", data=query_dict)
-        parsed_response = response.json()
+        parsed_response = self._parse_json(response)
         return parsed_response["value"]["report_id"]
 
     def create_async_skadnetwork_report(self, start_date, end_date,
@@ -210,8 +325,9 @@ class SingularClient(object):
         :param app: optional list of app names to filter by
         :param time_breakdown: Break results by the requested time period, for example TimeBreakdown.DAY
         :param country_code_format: Country code formatting option, for example CountryCodeFormat.ISO3
-        :param filters: a JSON encoded list of filters. Can be used to apply more complex filters than simply filtering
-          by app or source. The relation between different elements of the list is an AND relation.
+        :param filters: a list of filters, or the same list already JSON encoded. Can be used to apply more complex
+          filters than simply filtering by app or source. The relation between different elements of the list is an
+          AND relation.
           A full list of the dimensions you can filter by and potential values can be retrieved from the
           `get_reporting_filters` endpoint.
         :param skadnetwork_date_type: the type of date you want the report to be based on:
@@ -230,7 +346,7 @@ class SingularClient(object):
                                                       **kwargs)
 
         response = self._api_post("v2.0/create_async_skadnetwork_report", data=query_dict)
-        parsed_response = response.json()
+        parsed_response = self._parse_json(response)
         return parsed_response["value"]["report_id"]
 
     def get_report_status(self, report_id):
@@ -245,10 +361,115 @@ class SingularClient(object):
         """
         params = {"report_id": report_id}
         response = self._api_get("v2.0/get_report_status", params=params)
-        parsed_response = response.json()
+        parsed_response = self._parse_json(response)
         self._verify_legacy_error(parsed_response)
         return ReportStatusResponse(parsed_response["value"])
 
+    def wait_for_report(self, report_id, timeout=DEFAULT_WAIT_TIMEOUT, base_delay=1.0, max_delay=60.0):
+        """
+        Poll the status of a report until it is either DONE or FAILED.
+          Polls are spaced using capped exponential backoff with full jitter, so short reports are picked up
+          quickly while long reports (or many concurrent waiters) don't flood the API with status requests.
+
+        :param report_id: id generated by the create_async_report method
+        :param timeout: maximal number of seconds to wait for the report
+        :param base_delay: upper bound in seconds of the first delay between polls, doubled after every poll
+        :param max_delay: maximal upper bound in seconds of a delay between polls
+        :return: the last status of the report, still QUEUED or STARTED if `timeout` has elapsed
+        :rtype: ReportStatusResponse
+        """
+        deadline = _monotonic() + timeout
+        attempt = 0
+        while True:
+            report_status = self.get_report_status(report_id)
+            if report_status.status in (ReportStatusResponse.DONE, ReportStatusResponse.FAILED):
+                return report_status
+
+            remaining = deadline - _monotonic()
+            if remaining <= 0:
+                return report_status
+
+            time.sleep(min(self._backoff_delay(attempt, base_delay, max_delay), remaining))
+            attempt += 1
+
+    def poll_reports(self, report_ids, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get the status of several reports concurrently.
+          Status requests are sent from a thread pool and share the client's pooled connections.
+
+        :param report_ids: list of ids generated by the create_async_report method
+        :param max_workers: maximum number of concurrent status requests
+        :return: the status of each report, in the same order as `report_ids`
+        :rtype: list[ReportStatusResponse]
+        """
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(self.get_report_status, report_ids))
+
+    def run_reports_async(self, queries, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_WAIT_TIMEOUT,
+                          base_delay=1.0, max_delay=60.0):
+        """
+        Enqueue several async reports and wait for all of them.
+          All reports are created up front with `create_async_reports`, so they run on the server side at the
+          same time. The unfinished ones are then polled together with `poll_reports`, spaced like
+          `wait_for_report` polls, until all of them are DONE or FAILED.
+
+        :param queries: list of dicts, each holding the keyword arguments of a single `create_async_report` call
+        :param max_workers: maximum number of concurrent create/status requests
+        :param timeout: maximal number of seconds to wait for the whole batch, once all reports were created
+        :param base_delay: upper bound in seconds of the first delay between polls, doubled after every poll
+        :param max_delay: maximal upper bound in seconds of a delay between polls
+        :return: the last status of each report, in the same order as `queries`; reports still QUEUED or STARTED
+          once `timeout` has elapsed are returned as is
+        :rtype: list[ReportStatusResponse]
+        :raises Exception: if creating or polling any of the reports failed. The exception's `report_ids` attribute
+          holds the report_id of each query (None where creation failed), so the reports can still be tracked.
+        """
+        report_ids = self.create_async_reports(queries, max_workers)
+        report_statuses = [None] * len(report_ids)
+        pending = list(range(len(report_ids)))
+        deadline = _monotonic() + timeout
+        attempt = 0
+        try:
+            while True:
+                polled = self.poll_reports([report_ids[i] for i in pending], max_workers)
+                for i, report_status in zip(pending, polled):
+                    report_statuses[i] = report_status
+                pending = [i for i in pending if report_statuses[i].status not in (ReportStatusResponse.DONE,
+                                                                                   ReportStatusResponse.FAILED)]
+
+                remaining = deadline - _monotonic()
+                if not pending or remaining <= 0:
+                    return report_statuses
+
+                time.sleep(min(self._backoff_delay(attempt, base_delay, max_delay), remaining))
+                attempt += 1
+        except Exception as e:
+            e.report_ids = report_ids
+            raise
+
+    @staticmethod
+    def _backoff_delay(attempt, base_delay, max_delay):
+        # capped exponential backoff with full jitter
+        return random.uniform(0, min(max_delay, base_delay * 2 ** min(attempt, 16)))
+
+    def iter_report_download(self, download_url, chunk_size=DEFAULT_DOWNLOAD_CHUNK_SIZE):
+        """
+        Stream the results of a completed async report.
+          The download reuses the client's pooled connections and is read in chunks, so the report is never
+          held in memory as a whole.
+
+        :param download_url: the `download_url` of a DONE `ReportStatusResponse`
+        :param chunk_size: maximal size in bytes of each yielded chunk
+        :return: iterator over the (decompressed) report contents
+        :rtype: collections.Iterator[bytes]
+        """
+        # the download url is pre-signed, the API key must not be sent to its host
+        with self.session.get(download_url, headers={"Authorization": None}, stream=True,
+                              timeout=self.default_http_timeout) as response:
+            self._verify_response("report download", response)
+            for chunk in response.iter_content(chunk_size):
+                yield chunk
+
     def get_custom_dimensions(self):
         """
         Use this endpoint to return all the custom dimensions configured for your account by name and ID.
@@ -257,10 +478,8 @@ class SingularClient(object):
         :return: list of `CustomDimension` instances
         :rtype: list[CustomDimension]
         """
-        response = self._api_get("custom_dimensions")
-        parsed_response = response.json()
-        self._verify_legacy_error(parsed_response)
-        return CustomDimension.parse_list(parsed_response["value"]["custom_dimensions"])
+        value = self._get_metadata("custom_dimensions")
+        return CustomDimension.parse_list(value["custom_dimensions"])
 
     def get_cohort_metrics(self):
         """
@@ -269,10 +488,7 @@ class SingularClient(object):
         :return: a new `CohortMetricsResponse` instance
         :rtype: CohortMetricsResponse
         """
-        response = self._api_get("cohort_metrics")
-        parsed_response = response.json()
-        self._verify_legacy_error(parsed_response)
-        return CohortMetricsResponse(parsed_response["value"])
+        return CohortMetricsResponse(self._get_metadata("cohort_metrics"))
 
     def get_skan_events(self):
         """
@@ -281,10 +497,7 @@ class SingularClient(object):
         :return: a new `SkanEventsResponse` instance
         :rtype: SkanEventsResponse
         """
-        response = self._api_get("v2.0/skan_events")
-        parsed_response = response.json()
-        self._verify_legacy_error(parsed_response)
-        return SkanEventsResponse(parsed_response["value"])
+        return SkanEventsResponse(self._get_metadata("v2.0/skan_events"))
 
     def data_availability_status(self, data_date, format=Format.JSON, display_non_active_sources=False):
         """
@@ -307,7 +520,7 @@ class SingularClient(object):
 
         response = self._api_get("v2.0/data_availability_status", params=query_dict)
         if format == Format.JSON:
-            parsed_response = response.json()
+            parsed_response = self._parse_json(response)
             self._verify_legacy_error(parsed_response)
             return DataAvailabilityResponse(parsed_response["value"])
         elif format == Format.CSV:
@@ -344,9 +557,30 @@ class SingularClient(object):
         :return: dictionary of available filters and their respected values
         :rtype: dict[str, list[dict]]
         """
-        response = self._api_get("v2.0/reporting/filters")
-        parsed_response = response.json()
+        return self._get_metadata("v2.0/reporting/filters")
+
+    def invalidate_metadata(self):
+        """
+        Drop cached account metadata, so the next `get_custom_dimensions`, `get_cohort_metrics`,
+          `get_skan_events` or `get_reporting_filters` call fetches it from the API again
+        """
+        self._metadata_cache.clear()
+
+    def _get_metadata(self, endpoint):
+        """
+        GET the value of a rarely changing metadata endpoint, cached for `metadata_ttl` seconds
+        """
+        now = _monotonic()
+        cached = self._metadata_cache.get(endpoint)
+        if cached is not None and cached[0] > now:
+            # the raw body is cached and parsed on every hit, so callers can't mutate the cached value
+            return json_loads(cached[1])["value"]
+
+        response = self._api_get(endpoint)
+        parsed_response = self._parse_json(response)
         self._verify_legacy_error(parsed_response)
+        if self.metadata_ttl and self.metadata_ttl > 0:
+            self._metadata_cache[endpoint] = (now + self.metadata_ttl, response.content)
         return parsed_response["value"]
 
     @staticmethod
@@ -356,6 +590,10 @@ class SingularClient(object):
         else:
             return "false"
 
+    @staticmethod
+    def _as_list(value):
+        return list(value) if isinstance(value, (list, tuple)) else [value]
+
     @classmethod
     def _build_reporting_query(cls, start_date, end_date, format, dimensions, metrics, discrepancy_metrics,
                                cohort_metrics, cohort_periods, app, source, display_alignment, time_breakdown,
@@ -367,49 +605,44 @@ class SingularClient(object):
         cls._verify_param("time_breakdown", time_breakdown, TimeBreakdown)
         cls._verify_param("country_code_format", country_code_format, CountryCodeFormat)
 
-        if filters is None:
-            filters = []
-
         if cohort_metrics and not cohort_periods:
             raise ArgumentValidationException("`cohort_metrics` must be used with `cohort_periods`")
 
-        dimensions_request = ",".join(dimensions)
-        metrics_request = ",".join(metrics)
-        discrepancy_metrics_request = ",".join(discrepancy_metrics) if discrepancy_metrics else ""
+        if isinstance(filters, _string_types) and source is None and app is None:
+            # already JSON encoded and nothing to add, send it as is
+            encoded_filters = filters
+        else:
+            if isinstance(filters, _string_types):
+                filters = json_loads(filters)
+            # copy so the caller's filters list is never mutated by the source/app filters below
+            filters = list(filters) if filters else []
+            if source is not None:
+                filters.append({"dimension": "source", "operator": "in", "values": cls._as_list(source)})
+            if app is not None:
+                filters.append({"dimension": "app", "operator": "in", "values": cls._as_list(app)})
+            encoded_filters = json_dumps(filters) if filters else None
+
         query_dict = dict(
             start_date=start_date,
             end_date=end_date,
-            dimensions=dimensions_request,
-            metrics=metrics_request,
-            discrepancy_metrics=discrepancy_metrics_request,
+            dimensions=",".join(dimensions),
+            metrics=",".join(metrics),
+            discrepancy_metrics=",".join(discrepancy_metrics) if discrepancy_metrics else "",
             display_alignment=display_alignment,
             format=format,
             time_breakdown=time_breakdown,
             country_code_format=country_code_format,
         )
-        if source is not None:
-            if not isinstance(source, list):
-                sources = [source]
-            else:
-                sources = source
-            filters.append({"dimension": "source", "operator": "in", "values": sources})
-        if app is not None:
-            if not isinstance(app, list):
-                apps = [app]
-            else:
-                apps = app
-            filters.append({"dimension": "app", "operator": "in", "values": apps})
         if cohort_metrics:
             if isinstance(cohort_metrics, list):
-                cohort_metrics = [(i.name if isinstance(i, CohortMetric) else i) for i in cohort_metrics]
-                cohort_metrics = ",".join(cohort_metrics)
-            query_dict.update({'cohort_metrics': cohort_metrics})
+                cohort_metrics = ",".join([(i.name if isinstance(i, CohortMetric) else i) for i in cohort_metrics])
+            query_dict["cohort_metrics"] = cohort_metrics
         if cohort_periods:
             if isinstance(cohort_periods, list):
                 cohort_periods = ",".join(cohort_periods)
-            query_dict.update({'cohort_periods': cohort_periods})
-        if filters:
-            query_dict["filters"] = json.dumps(filters)
+            query_dict["cohort_periods"] = cohort_periods
+        if encoded_filters:
+            query_dict["filters"] = encoded_filters
 
         query_dict.update(kwargs)
         return query_dict
@@ -445,9 +678,18 @@ class SingularClient(object):
     @staticmethod
     def _verify_param(param_name, value, base_class):
         expected_values = base_class.__ALL_OPTIONS__
-        if value not in expected_values:
+        try:
+            valid = value in expected_values
+        except TypeError:  # unhashable, e.g. a list
+            valid = False
+        if not valid:
             raise ArgumentValidationException("unexpected %s value %s, expected one of %s" %
-                                              (param_name, repr(value), repr(expected_values)))
+                                              (param_name, repr(value), repr(sorted(expected_values))))
+
+    @staticmethod
+    def _parse_json(response):
+        # decode the raw body directly, skipping requests' charset detection
+        return json_loads(response.content)
 
     @staticmethod
     def _verify_legacy_error(parsed_response):
@@ -462,23 +704,22 @@ class SingularClient(object):
 
     def _api_request(self, method, endpoint, **kwargs):
         url = self.BASE_API_URL + endpoint
-        headers = {"Authorization": self.api_key,
-                   'User-Agent': self.user_agent}
-
         response = self.session.request(method, url,
-                                        headers=headers,
                                         timeout=self.default_http_timeout,
                                         **kwargs)
 
-        logger.info("%(method)s %(url)s, kwargs = %(kwargs)s --> code = %(code)s" %
-                    dict(method=method, url=url, kwargs=repr(kwargs), code=response.status_code))
+        logger.info("%s %s, kwargs = %r --> code = %s", method, url, kwargs, response.status_code)
+
+        self._verify_response(endpoint, response)
+        return response
 
+    @staticmethod
+    def _verify_response(name, response):
         if not response.ok:
-            if response.status_code is None or response.status_code >= 500 < 600:
-                raise UnexpectedAPIException("%s failed with code = %s, payload = %s" % (
-                    endpoint, response.status_code, response.text))
+            code = response.status_code
+            message = "%s failed with code = %s, payload = %s" % (name, code, response.text)
+            # rate limiting (429) is worth retrying later, like server errors
+            if code is None or code == 429 or 500 <= code < 600:
+                raise UnexpectedAPIException(message)
             else:
-                raise APIException("%s failed with code = %s, payload = %s" % (
-                    endpoint, response.status_code, response.text))
-
-        return response
+                raise APIException(message)